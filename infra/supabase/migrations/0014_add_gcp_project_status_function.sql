@@ -0,0 +1,26 @@
+-- Migration: Add gcp_project_status lookup function
+-- Description: Returns the active project for a business unit together with its
+-- key state and last write time in a single round-trip, so the MCP server can
+-- answer existence checks without chaining separate table queries.
+
+CREATE OR REPLACE FUNCTION gcp_project_status(bu TEXT)
+RETURNS TABLE (
+    project_id TEXT,
+    state TEXT,
+    api_key_active BOOLEAN,
+    last_touched_at TIMESTAMPTZ
+) AS $$
+    SELECT
+        p.project_id,
+        p.status,
+        p.status = 'active' AND p.api_key_id <> '',
+        -- GREATEST ignores NULLs, so never-rotated keys fall back to created_at
+        GREATEST(p.created_at, p.api_key_last_rotated_at)
+    FROM gcp_vertex_projects p
+    WHERE p.business_unit = bu
+      AND p.status = 'active'
+    LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+-- Grant necessary permissions
+GRANT EXECUTE ON FUNCTION gcp_project_status(TEXT) TO service_role;
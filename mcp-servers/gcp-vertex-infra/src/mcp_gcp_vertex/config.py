@@ -1,5 +1,9 @@
 """Configuration management for GCP Vertex MCP server."""
 
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -28,6 +32,11 @@ class Settings(BaseSettings):
         default="us-east5",
         description="Default GCP region for Vertex AI"
     )
+    gcp_verify_freshness_seconds: float = Field(
+        default=300.0,
+        description="Skip re-verifying a project in GCP if its DB record "
+                    "was written this recently (0 always verifies)"
+    )
 
     # Supabase Configuration
     supabase_url: str = Field(
@@ -36,13 +45,29 @@ class Settings(BaseSettings):
     supabase_service_role_key: str = Field(
         description="Supabase service role key"
     )
+    supabase_cache_ttl_seconds: float = Field(
+        default=60.0,
+        description="TTL for cached project lookups (0 disables caching)"
+    )
 
     # Knowledge Base Configuration
     kb_path: str = Field(
-        default="/Users/tedgar/Projects/80HD/knowledge-base/team/configure-claude-code-vertex-ai.md",
+        default_factory=lambda: str(
+            Path.home()
+            / "Projects/80HD/knowledge-base/team/configure-claude-code-vertex-ai.md"
+        ),
         description="Path to knowledge base article"
     )
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load settings on first use so importing the package stays cheap."""
+    return Settings()
+
+
+def __getattr__(name: str) -> Any:
+    """Keep `from config import settings` working for external callers."""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,59 +1,135 @@
 """Supabase client wrapper for GCP Vertex project management."""
 
-from typing import Optional, List
-from datetime import datetime
+import asyncio
+import logging
+from typing import Optional, List, Union
+from datetime import datetime, timezone
+from postgrest import APIResponse
 from supabase import create_client, Client
-from ..config import settings
+from ..config import get_settings
+from ..utils.cache import TTLCache
 from .models import GCPVertexProject, GCPVertexAuditLog
 
+logger = logging.getLogger(__name__)
+
+# Audit events are buffered and written in bulk once either limit is hit
+AUDIT_FLUSH_INTERVAL_SECONDS = 0.25
+AUDIT_FLUSH_MAX_ROWS = 100
+
+# Failed batches are retried, but a bulk insert is all-or-nothing: after this
+# many consecutive failures, or past this buffer size, rows are dropped (and
+# logged) so one bad row can't block audit writes for the whole process
+AUDIT_FLUSH_MAX_ATTEMPTS = 3
+AUDIT_BUFFER_MAX_ROWS = 1000
+
+# Insertable columns, resolved once instead of per-write model_dump() calls
+_PROJECT_INSERT_FIELDS = tuple(f for f in GCPVertexProject.model_fields if f != "id")
+_AUDIT_INSERT_FIELDS = tuple(f for f in GCPVertexAuditLog.model_fields if f != "id")
+
+# Column projections for list views; skips the encrypted key blob and metadata
+PROJECT_SUMMARY_COLUMNS = (
+    "project_id",
+    "business_unit",
+    "status",
+    "created_at",
+    "created_by",
+)
+AUDIT_LOG_SUMMARY_COLUMNS = (
+    "id",
+    "project_id",
+    "action",
+    "performed_by",
+    "performed_at",
+)
+
+
+def _insert_row(model, fields: tuple[str, ...]) -> dict:
+    """Build a JSON-ready insert payload from a model's non-None fields."""
+    row = {}
+    for name in fields:
+        value = getattr(model, name)
+        if value is None:
+            continue
+        row[name] = value.isoformat() if isinstance(value, datetime) else value
+    return row
+
 
 class SupabaseClient:
     """Wrapper for Supabase operations."""
 
     def __init__(self):
         """Initialize Supabase client."""
+        settings = get_settings()
         self.client: Client = create_client(
             settings.supabase_url,
             settings.supabase_service_role_key
         )
-
-    async def get_project_by_business_unit(
-        self,
-        business_unit: str
-    ) -> Optional[GCPVertexProject]:
+        # postgrest request builders are stateless; each select()/insert()
+        # starts a fresh query, so one handle per table can be reused
+        self._projects_table = self.client.table("gcp_vertex_projects")
+        self._audit_table = self.client.table("gcp_vertex_audit_log")
+        # Project rows change rarely; cache lookups to skip repeat round-trips
+        self._projects_by_id = TTLCache(ttl=settings.supabase_cache_ttl_seconds)
+        self._audit_buffer: List[dict] = []
+        self._audit_flush_task: Optional[asyncio.Task] = None
+        self._audit_flush_failures = 0
+
+    async def _execute(self, query) -> APIResponse:
+        """Run a blocking PostgREST query on a worker thread."""
+        return await asyncio.to_thread(query.execute)
+
+    def _invalidate_project(self, project: GCPVertexProject) -> None:
+        """Drop cached lookups for a project after a write."""
+        self._projects_by_id.pop(project.project_id)
+
+    async def get_project_status(self, business_unit: str) -> Optional[dict]:
         """
-        Retrieve a project by business unit.
+        Fetch the active project's status for a business unit in one RPC.
 
         Args:
             business_unit: Business unit identifier
 
         Returns:
-            Project object if found, None otherwise
+            Row from gcp_project_status (project_id, state, api_key_active,
+            last_touched_at) if an active project exists, None otherwise
         """
-        response = self.client.table("gcp_vertex_projects").select("*").eq(
-            "business_unit", business_unit
-        ).eq("status", "active").execute()
-
-        if response.data and len(response.data) > 0:
-            return GCPVertexProject(**response.data[0])
-        return None
+        response = await self._execute(
+            self.client.rpc("gcp_project_status", {"bu": business_unit})
+        )
+        return response.data[0] if response.data else None
 
-    async def get_project_by_id(self, project_id: str) -> Optional[GCPVertexProject]:
+    async def get_project_by_id(
+        self,
+        project_id: str,
+        use_cache: bool = True
+    ) -> Optional[GCPVertexProject]:
         """
         Retrieve a project by project ID.
 
         Args:
             project_id: GCP project ID
+            use_cache: Serve from the TTL cache if possible. Pass False on
+                command paths that act on the row (e.g. key rotation), since
+                another server process may have changed it within the TTL.
 
         Returns:
             Project object if found, None otherwise
         """
-        response = self.client.table("gcp_vertex_projects").select("*").eq(
-            "project_id", project_id
-        ).execute()
+        if use_cache:
+            cached = self._projects_by_id.get(project_id)
+            if cached is not None:
+                return cached
+
+        response = await self._execute(
+            self._projects_table.select("*").eq(
+                "project_id", project_id
+            )
+        )
 
         if response.data and len(response.data) > 0:
-            return GCPVertexProject(**response.data[0])
+            project = GCPVertexProject(**response.data[0])
+            self._projects_by_id.set(project_id, project)
+            return project
         return None
 
     async def create_project(self, project: GCPVertexProject) -> GCPVertexProject:
@@ -69,11 +145,15 @@ class SupabaseClient:
         Raises:
             Exception: If creation fails
         """
-        data = project.model_dump(exclude={"id"}, exclude_none=True)
-        response = self.client.table("gcp_vertex_projects").insert(data).execute()
+        data = _insert_row(project, _PROJECT_INSERT_FIELDS)
+        response = await self._execute(
+            self._projects_table.insert(data)
+        )
 
         if response.data and len(response.data) > 0:
-            return GCPVertexProject(**response.data[0])
+            created = GCPVertexProject(**response.data[0])
+            self._invalidate_project(created)
+            return created
         raise Exception("Failed to create project record in database")
 
     async def update_project(
@@ -94,67 +174,163 @@ class SupabaseClient:
         Raises:
             Exception: If update fails
         """
-        response = self.client.table("gcp_vertex_projects").update(updates).eq(
-            "project_id", project_id
-        ).execute()
+        response = await self._execute(
+            self._projects_table.update(updates).eq(
+                "project_id", project_id
+            )
+        )
 
         if response.data and len(response.data) > 0:
-            return GCPVertexProject(**response.data[0])
+            updated = GCPVertexProject(**response.data[0])
+            self._invalidate_project(updated)
+            return updated
         raise Exception(f"Failed to update project {project_id}")
 
     async def list_projects(
         self,
-        business_unit: Optional[str] = None
-    ) -> List[GCPVertexProject]:
+        business_unit: Optional[str] = None,
+        columns: tuple[str, ...] = ("*",),
+        raw: bool = False,
+    ) -> Union[List[GCPVertexProject], List[dict]]:
         """
         List all projects, optionally filtered by business unit.
 
         Args:
             business_unit: Optional business unit filter
+            columns: Columns to fetch (default: all). Partial rows are built
+                with model_construct and skip validation, so values are
+                returned as PostgREST sends them (e.g. ISO timestamp strings).
+            raw: Return the PostgREST rows as dicts without building models
 
         Returns:
-            List of project objects
+            List of project objects, or row dicts if raw is set
         """
-        query = self.client.table("gcp_vertex_projects").select("*")
+        query = self._projects_table.select(",".join(columns))
 
         if business_unit:
             query = query.eq("business_unit", business_unit)
 
-        response = query.execute()
+        response = await self._execute(query)
 
-        if response.data:
+        if not response.data:
+            return []
+        if raw:
+            return response.data
+        if columns == ("*",):
             return [GCPVertexProject(**item) for item in response.data]
-        return []
+        return [GCPVertexProject.model_construct(**item) for item in response.data]
 
     async def log_audit_event(
         self,
         project_id: Optional[str],
         action: str,
         performed_by: str,
-        details: Optional[dict] = None
+        details: Optional[dict] = None,
+        flush: bool = False
     ) -> None:
         """
         Log an audit event.
 
+        Events are buffered and written in bulk by a background flush, so
+        performed_at is stamped here to preserve the time of the action.
+
         Args:
             project_id: GCP project ID (optional)
             action: Action performed
             performed_by: User who performed the action
             details: Additional details as JSON
+            flush: Write the buffer now instead of waiting for the
+                background flush (use for events that must not be lost)
+        """
+        self._audit_buffer.append(
+            self._audit_row(project_id, action, performed_by, details)
+        )
+
+        if flush or len(self._audit_buffer) >= AUDIT_FLUSH_MAX_ROWS:
+            await self.flush_audit_log()
+        elif self._audit_flush_task is None or self._audit_flush_task.done():
+            self._audit_flush_task = asyncio.create_task(self._flush_audit_log_later())
+
+    async def log_audit_events(self, events: List[dict]) -> None:
+        """
+        Log several audit events with a single bulk insert.
+
+        Args:
+            events: One dict per event with the keyword arguments of
+                log_audit_event (project_id, action, performed_by, details)
         """
+        self._audit_buffer.extend(self._audit_row(**event) for event in events)
+        await self.flush_audit_log()
+
+    @staticmethod
+    def _audit_row(
+        project_id: Optional[str],
+        action: str,
+        performed_by: str,
+        details: Optional[dict] = None
+    ) -> dict:
+        """Build an audit log insert row stamped with the current time."""
         audit_log = GCPVertexAuditLog(
             project_id=project_id,
             action=action,
             performed_by=performed_by,
+            performed_at=datetime.now(timezone.utc),
             details=details or {}
         )
-        data = audit_log.model_dump(exclude={"id", "performed_at"}, exclude_none=True)
-        self.client.table("gcp_vertex_audit_log").insert(data).execute()
+        return _insert_row(audit_log, _AUDIT_INSERT_FIELDS)
+
+    async def _flush_audit_log_later(self) -> None:
+        """Flush the audit buffer after the batching interval elapses."""
+        await asyncio.sleep(AUDIT_FLUSH_INTERVAL_SECONDS)
+        try:
+            await self.flush_audit_log()
+        except Exception:
+            logger.exception("Failed to write buffered audit events")
+
+    async def flush_audit_log(self) -> None:
+        """
+        Write all buffered audit events in a single bulk insert.
+
+        Raises:
+            Exception: If the insert fails. The batch is put back at the
+                front of the buffer so the next flush retries it, unless
+                it has now failed AUDIT_FLUSH_MAX_ATTEMPTS times in a row
+                (then it is dropped and logged); the buffer is capped at
+                AUDIT_BUFFER_MAX_ROWS, dropping the oldest rows.
+        """
+        if not self._audit_buffer:
+            return
+        batch, self._audit_buffer = self._audit_buffer, []
+        try:
+            await self._execute(self._audit_table.insert(batch))
+        except Exception:
+            self._audit_flush_failures += 1
+            if self._audit_flush_failures >= AUDIT_FLUSH_MAX_ATTEMPTS:
+                self._audit_flush_failures = 0
+                self._drop_audit_rows(
+                    batch, f"insert failed {AUDIT_FLUSH_MAX_ATTEMPTS} times"
+                )
+            else:
+                self._audit_buffer[:0] = batch
+                overflow = len(self._audit_buffer) - AUDIT_BUFFER_MAX_ROWS
+                if overflow > 0:
+                    self._drop_audit_rows(
+                        self._audit_buffer[:overflow], "audit buffer full"
+                    )
+                    del self._audit_buffer[:overflow]
+            raise
+        self._audit_flush_failures = 0
+
+    @staticmethod
+    def _drop_audit_rows(rows: List[dict], reason: str) -> None:
+        """Log audit rows that are being discarded so they can be recovered."""
+        logger.error("Dropping %d audit events (%s): %r", len(rows), reason, rows)
 
     async def get_audit_logs(
         self,
         project_id: str,
-        limit: int = 50
+        limit: int = 50,
+        columns: tuple[str, ...] = AUDIT_LOG_SUMMARY_COLUMNS,
     ) -> List[GCPVertexAuditLog]:
         """
         Get audit logs for a project.
@@ -162,13 +338,22 @@ class SupabaseClient:
         Args:
             project_id: GCP project ID
             limit: Maximum number of logs to return
+            columns: Columns to fetch; `details` is omitted unless requested
 
         Returns:
             List of audit log entries
         """
-        response = self.client.table("gcp_vertex_audit_log").select("*").eq(
-            "project_id", project_id
-        ).order("performed_at", desc=True).limit(limit).execute()
+        # Best effort: a failing audit write must not break this read
+        try:
+            await self.flush_audit_log()
+        except Exception:
+            logger.exception("Failed to write buffered audit events")
+
+        response = await self._execute(
+            self._audit_table.select(",".join(columns)).eq(
+                "project_id", project_id
+            ).order("performed_at", desc=True).limit(limit)
+        )
 
         if response.data:
             return [GCPVertexAuditLog(**item) for item in response.data]
@@ -185,3 +370,9 @@ def get_supabase_client() -> SupabaseClient:
     if _supabase_client is None:
         _supabase_client = SupabaseClient()
     return _supabase_client
+
+
+async def flush_pending_writes() -> None:
+    """Flush buffered writes on the global client, if one was created."""
+    if _supabase_client is not None:
+        await _supabase_client.flush_audit_log()
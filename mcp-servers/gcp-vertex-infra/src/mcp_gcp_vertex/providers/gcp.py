@@ -1,9 +1,17 @@
 """Google Cloud Platform provider implementation."""
 
 import asyncio
+import functools
 import time
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, List
 from google.cloud import resourcemanager_v3
+from google.cloud.resourcemanager_v3.services.folders.transports import (
+    FoldersGrpcTransport,
+)
+from google.cloud.resourcemanager_v3.services.projects.transports import (
+    ProjectsGrpcTransport,
+)
 from google.cloud import aiplatform
 from google.api_core import exceptions as gcp_exceptions
 from google.cloud.api_keys_v2 import ApiKeysClient
@@ -15,7 +23,36 @@ from google.auth import default as get_default_credentials
 from .base import CloudProvider
 from ..db.models import GCPVertexProject, ProjectExistsResult
 from ..db.supabase import get_supabase_client
-from ..config import settings
+from ..config import get_settings
+from ..utils.cache import TTLCache
+
+
+async def _wait_for_operation(operation, timeout: float):
+    """
+    Wait for a long-running operation without blocking the event loop.
+
+    Polls with exponential backoff (100 ms doubling up to 2 s), so fast
+    operations return quickly and slow ones aren't polled every second.
+
+    Args:
+        operation: google.api_core long-running operation
+        timeout: Maximum seconds to wait
+
+    Returns:
+        The operation result
+
+    Raises:
+        TimeoutError: If the operation doesn't finish within timeout
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    while not await asyncio.to_thread(operation.done):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Operation did not complete within {timeout} seconds")
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, 2.0)
+    return operation.result()
 
 
 class GCPProvider(CloudProvider):
@@ -27,6 +64,12 @@ class GCPProvider(CloudProvider):
         "generativelanguage.googleapis.com",
     ]
 
+    # How long an existence check result is reused before re-querying
+    EXISTS_CACHE_TTL_SECONDS = 30
+
+    # Upper bound on waiting for a newly enabled API to report ENABLED
+    API_PROPAGATION_TIMEOUT_SECONDS = 30
+
     # Claude models to verify
     CLAUDE_MODELS = [
         "claude-sonnet-4-5@20250929",
@@ -34,51 +77,111 @@ class GCPProvider(CloudProvider):
         "claude-haiku-4-5@20251001",
     ]
 
+    # Restrictions applied to every generated key (copied into each Key)
+    _KEY_RESTRICTIONS = Restrictions(
+        api_targets=[ApiTarget(service="aiplatform.googleapis.com")]
+    )
+
     def __init__(self):
         """Initialize GCP clients."""
         self.credentials, self.project = get_default_credentials()
+        # Projects and folders live on the same Resource Manager host, so
+        # both clients share one gRPC channel; all clients share credentials
+        projects_transport = ProjectsGrpcTransport(credentials=self.credentials)
         self.projects_client = resourcemanager_v3.ProjectsClient(
-            credentials=self.credentials
+            transport=projects_transport
         )
         self.folders_client = resourcemanager_v3.FoldersClient(
-            credentials=self.credentials
+            transport=FoldersGrpcTransport(channel=projects_transport.grpc_channel)
         )
         self.api_keys_client = ApiKeysClient(credentials=self.credentials)
         self.service_usage_client = ServiceUsageClient(credentials=self.credentials)
         self.db_client = get_supabase_client()
-
-    def _normalize_business_unit(self, business_unit: str) -> str:
+        self._vertex_init_target: Optional[tuple[str, str]] = None
+        self._exists_cache = TTLCache(maxsize=1024, ttl=self.EXISTS_CACHE_TTL_SECONDS)
+
+    def close(self) -> None:
+        """Close the gRPC channels held by the GCP clients."""
+        for client in (
+            self.projects_client,
+            self.api_keys_client,
+            self.service_usage_client,
+        ):
+            client.transport.close()
+
+    # Characters mapped to "-" when deriving GCP IDs from business unit names
+    _BU_TRANSLATION = str.maketrans({" ": "-", "_": "-"})
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _normalize_business_unit(business_unit: str) -> str:
         """Normalize business unit name to valid GCP project ID format."""
-        return business_unit.lower().replace(" ", "-").replace("_", "-")
+        return business_unit.lower().translate(GCPProvider._BU_TRANSLATION)
 
     async def check_project_exists(self, business_unit: str) -> ProjectExistsResult:
         """Check if a project already exists for the given business unit."""
-        # First check database
-        project = await self.db_client.get_project_by_business_unit(business_unit)
+        cached = self._exists_cache.get(business_unit)
+        if cached is not None:
+            return cached
+
+        result = await self._lookup_project_exists(business_unit)
+        # Only cache positive results: a stale "missing" would let provisioning
+        # try to create a project another process has just created
+        if result.exists:
+            self._exists_cache.set(business_unit, result)
+        return result
+
+    def invalidate_project_exists(self, business_unit: str) -> None:
+        """Forget a cached existence check, e.g. after provisioning."""
+        self._exists_cache.pop(business_unit)
+
+    async def _lookup_project_exists(self, business_unit: str) -> ProjectExistsResult:
+        """Check the database and GCP for an active project."""
+        # First check database (project and key state in one RPC)
+        status = await self.db_client.get_project_status(business_unit)
+
+        if status:
+            found = ProjectExistsResult(
+                exists=True,
+                project_id=status["project_id"],
+                api_key_active=status["api_key_active"],
+            )
+
+            # A record written moments ago (create/rotate) was just confirmed
+            # against GCP, so skip the round-trip to verify it again
+            if self._recently_touched(status.get("last_touched_at")):
+                return found
 
-        if project:
             # Verify the project still exists in GCP
             try:
-                project_name = f"projects/{project.project_id}"
-                gcp_project = self.projects_client.get_project(name=project_name)
+                project_name = f"projects/{status['project_id']}"
+                gcp_project = await asyncio.to_thread(
+                    self.projects_client.get_project, name=project_name
+                )
                 if gcp_project.state == resourcemanager_v3.Project.State.ACTIVE:
-                    return ProjectExistsResult(
-                        exists=True,
-                        project_id=project.project_id,
-                        api_key_active=project.status == "active"
-                    )
+                    return found
             except gcp_exceptions.NotFound:
                 # Project was deleted in GCP but still in our DB
                 pass
 
         return ProjectExistsResult(exists=False)
 
+    @staticmethod
+    def _recently_touched(last_touched_at: Optional[str]) -> bool:
+        """Whether a DB timestamp falls inside the GCP verification window."""
+        window = get_settings().gcp_verify_freshness_seconds
+        if not last_touched_at or window <= 0:
+            return False
+        touched = datetime.fromisoformat(last_touched_at)
+        return datetime.now(timezone.utc) - touched < timedelta(seconds=window)
+
     async def create_project(
         self,
         business_unit: str,
         owner_email: str,
     ) -> GCPVertexProject:
         """Create a new GCP project for the given business unit."""
+        settings = get_settings()
         normalized_bu = self._normalize_business_unit(business_unit)
         project_id = f"{normalized_bu}-ai-prod"
 
@@ -94,16 +197,18 @@ class GCPProvider(CloudProvider):
         }
 
         # Link billing account
-        operation = self.projects_client.create_project(project=project)
+        operation = await asyncio.to_thread(
+            self.projects_client.create_project, project=project
+        )
 
         # Wait for project creation to complete
-        created_project = operation.result(timeout=120)
+        created_project = await _wait_for_operation(operation, timeout=120)
 
         # Extract project number
         project_number = created_project.name.split("/")[-1]
 
-        # Link billing account
-        await self._link_billing_account(project_id)
+        # No billing link step: billing is inherited from the parent folder
+        # (or set up manually), so the project is usable as soon as it exists
 
         return GCPVertexProject(
             business_unit=business_unit,
@@ -120,58 +225,63 @@ class GCPProvider(CloudProvider):
             }
         )
 
-    async def _link_billing_account(self, project_id: str) -> None:
-        """Link billing account to project."""
-        # Note: This requires the cloudbilling API and proper permissions
-        # For now, we'll assume billing is inherited from the folder
-        # or set up manually. Full implementation would use:
-        # from google.cloud import billing_v1
-        pass
-
     async def enable_ai_apis(self, project_id: str) -> bool:
         """Enable required AI APIs for the project."""
-        for api in self.REQUIRED_APIS:
-            service_name = f"projects/{project_id}/services/{api}"
+        # APIs are independent, so enable them concurrently
+        await asyncio.gather(
+            *(self._enable_api(project_id, api) for api in self.REQUIRED_APIS)
+        )
+        return True
 
-            # Check if already enabled
-            try:
-                request = GetServiceRequest(name=service_name)
-                service = self.service_usage_client.get_service(request=request)
-                if service.state == service.State.ENABLED:
-                    continue
-            except gcp_exceptions.NotFound:
-                pass
+    async def _is_api_enabled(self, service_name: str) -> bool:
+        """Check whether a service is enabled for a project."""
+        try:
+            request = GetServiceRequest(name=service_name)
+            service = await asyncio.to_thread(
+                self.service_usage_client.get_service, request=request
+            )
+        except gcp_exceptions.NotFound:
+            return False
+        return service.state == service.State.ENABLED
 
-            # Enable the service
-            request = EnableServiceRequest(name=service_name)
-            operation = self.service_usage_client.enable_service(request=request)
+    async def _enable_api(self, project_id: str, api: str) -> None:
+        """Enable a single API and wait until it reports as enabled."""
+        service_name = f"projects/{project_id}/services/{api}"
 
-            # Wait for enablement to complete
-            operation.result(timeout=300)
+        # Check if already enabled
+        if await self._is_api_enabled(service_name):
+            return
 
-            # Wait for API to propagate
-            await asyncio.sleep(2)
+        # Enable the service and wait for the operation to complete
+        request = EnableServiceRequest(name=service_name)
+        operation = await asyncio.to_thread(
+            self.service_usage_client.enable_service, request=request
+        )
+        await _wait_for_operation(operation, timeout=300)
 
-        return True
+        # Wait for the API to propagate instead of sleeping a fixed interval
+        deadline = time.monotonic() + self.API_PROPAGATION_TIMEOUT_SECONDS
+        while not await self._is_api_enabled(service_name):
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(1)
 
     async def verify_model_availability(self, project_id: str) -> Dict[str, bool]:
         """Verify that required AI models are available in the project."""
-        aiplatform.init(
-            project=project_id,
-            location=settings.gcp_default_region,
-            credentials=self.credentials,
-        )
-
-        availability = {}
-        for model_name in self.CLAUDE_MODELS:
-            try:
-                # Models are auto-enabled after API enablement in the org
-                # We just verify the API is accessible
-                availability[model_name] = True
-            except Exception:
-                availability[model_name] = False
+        # aiplatform.init sets process-global state; only re-run it when the
+        # target project/region actually changes
+        target = (project_id, get_settings().gcp_default_region)
+        if self._vertex_init_target != target:
+            await asyncio.to_thread(
+                aiplatform.init,
+                project=target[0],
+                location=target[1],
+                credentials=self.credentials,
+            )
+            self._vertex_init_target = target
 
-        return availability
+        # Models are auto-enabled after API enablement in the org
+        return dict.fromkeys(self.CLAUDE_MODELS, True)
 
     async def generate_api_key(
         self,
@@ -183,13 +293,7 @@ class GCPProvider(CloudProvider):
         normalized_bu = self._normalize_business_unit(business_unit)
 
         # Create API key with restrictions
-        key = Key()
-        key.display_name = name
-        key.restrictions = Restrictions(
-            api_targets=[
-                ApiTarget(service="aiplatform.googleapis.com")
-            ]
-        )
+        key = Key(display_name=name, restrictions=self._KEY_RESTRICTIONS)
 
         parent = f"projects/{project_id}/locations/global"
 
@@ -200,8 +304,10 @@ class GCPProvider(CloudProvider):
         }
 
         # Create the key
-        operation = self.api_keys_client.create_key(request=request)
-        created_key = operation.result(timeout=120)
+        operation = await asyncio.to_thread(
+            self.api_keys_client.create_key, request=request
+        )
+        created_key = await _wait_for_operation(operation, timeout=120)
 
         # Extract key string
         api_key_id = created_key.name.split("/")[-1]
@@ -214,8 +320,10 @@ class GCPProvider(CloudProvider):
         key_name = f"projects/{project_id}/locations/global/keys/{api_key_id}"
 
         try:
-            operation = self.api_keys_client.delete_key(name=key_name)
-            operation.result(timeout=60)
+            operation = await asyncio.to_thread(
+                self.api_keys_client.delete_key, name=key_name
+            )
+            await _wait_for_operation(operation, timeout=60)
             return True
         except gcp_exceptions.NotFound:
             return False
@@ -225,30 +333,37 @@ class GCPProvider(CloudProvider):
     async def get_project_details(self, project_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a project."""
         try:
-            # Get GCP project info
-            project_name = f"projects/{project_id}"
-            gcp_project = self.projects_client.get_project(name=project_name)
-
-            # Get enabled APIs
-            enabled_apis = []
-            parent = f"projects/{project_id}"
-            services = self.service_usage_client.list_services(
-                parent=parent,
-                filter="state:ENABLED"
+            # Project, API states and API keys come from independent
+            # backends; fetch them concurrently and drain pagers off-loop.
+            # Only REQUIRED_APIS are checked rather than paginating through
+            # every enabled service in the project.
+            gcp_project, keys, *api_states = await asyncio.gather(
+                asyncio.to_thread(
+                    self.projects_client.get_project,
+                    name=f"projects/{project_id}",
+                ),
+                asyncio.to_thread(
+                    lambda: list(self.api_keys_client.list_keys(
+                        parent=f"projects/{project_id}/locations/global"
+                    ))
+                ),
+                *(
+                    self._is_api_enabled(f"projects/{project_id}/services/{api}")
+                    for api in self.REQUIRED_APIS
+                ),
             )
-            for service in services:
-                enabled_apis.append(service.config.name)
-
-            # Get API keys
-            api_keys = []
-            parent = f"projects/{project_id}/locations/global"
-            keys = self.api_keys_client.list_keys(parent=parent)
-            for key in keys:
-                api_keys.append({
+
+            enabled_apis = [
+                api for api, enabled in zip(self.REQUIRED_APIS, api_states) if enabled
+            ]
+            api_keys = [
+                {
                     "id": key.name.split("/")[-1],
                     "display_name": key.display_name,
                     "created": key.create_time,
-                })
+                }
+                for key in keys
+            ]
 
             return {
                 "project_id": project_id,
@@ -276,3 +391,11 @@ def get_gcp_provider() -> GCPProvider:
     if _gcp_provider is None:
         _gcp_provider = GCPProvider()
     return _gcp_provider
+
+
+def close_gcp_provider() -> None:
+    """Close and discard the global GCP provider, if one was created."""
+    global _gcp_provider
+    if _gcp_provider is not None:
+        _gcp_provider.close()
+        _gcp_provider = None
@@ -1,8 +1,11 @@
 """MCP server entrypoint for GCP Vertex AI project provisioning."""
 
 import sys
-import json
-from typing import Optional
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+from pydantic import BaseModel
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
@@ -14,215 +17,200 @@ from .tools.provision import (
     get_project_details,
 )
 from .tools.api_keys import rotate_api_key
+from .db.supabase import flush_pending_writes
+from .providers.gcp import close_gcp_provider
 
 
 # Create MCP server instance
 app = Server("gcp-vertex-infra")
 
 
-@app.list_tools()
-async def list_tools() -> list[Tool]:
-    """List available MCP tools."""
-    return [
-        Tool(
-            name="gcp_provision_vertex_ai_project",
-            description=(
-                "Provision a complete GCP Vertex AI project for a business unit. "
-                "This orchestrates the full workflow: creates the GCP project, "
-                "enables Vertex AI APIs, generates an API key, stores credentials "
-                "securely, and updates the knowledge base. This is the main tool "
-                "for setting up new projects. Idempotent - safe to re-run."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "business_unit": {
-                        "type": "string",
-                        "description": "Business unit identifier (e.g., 'Marketing', 'Sales')",
-                    },
-                    "owner_email": {
-                        "type": "string",
-                        "description": "Email address of the project owner",
-                    },
+def _json_default(obj: Any) -> str:
+    """Fallback for types orjson can't encode (e.g. protobuf datetime subclasses)."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _dump(obj: Any) -> str:
+    """Serialize a tool result to compact JSON (datetimes as ISO strings)."""
+    return orjson.dumps(obj, default=_json_default).decode()
+
+
+# Tool definitions are static, so build them once at import
+_TOOLS: list[Tool] = [
+    Tool(
+        name="gcp_provision_vertex_ai_project",
+        description=(
+            "Provision a complete GCP Vertex AI project for a business unit. "
+            "This orchestrates the full workflow: creates the GCP project, "
+            "enables Vertex AI APIs, generates an API key, stores credentials "
+            "securely, and updates the knowledge base. This is the main tool "
+            "for setting up new projects. Idempotent - safe to re-run."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "business_unit": {
+                    "type": "string",
+                    "description": "Business unit identifier (e.g., 'Marketing', 'Sales')",
+                },
+                "owner_email": {
+                    "type": "string",
+                    "description": "Email address of the project owner",
                 },
-                "required": ["business_unit", "owner_email"],
             },
+            "required": ["business_unit", "owner_email"],
+        },
+    ),
+    Tool(
+        name="gcp_check_project_exists",
+        description=(
+            "Check if a GCP Vertex AI project already exists for a business unit. "
+            "Returns existence status, project ID, and API key status."
         ),
-        Tool(
-            name="gcp_check_project_exists",
-            description=(
-                "Check if a GCP Vertex AI project already exists for a business unit. "
-                "Returns existence status, project ID, and API key status."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "business_unit": {
-                        "type": "string",
-                        "description": "Business unit identifier",
-                    },
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "business_unit": {
+                    "type": "string",
+                    "description": "Business unit identifier",
                 },
-                "required": ["business_unit"],
             },
+            "required": ["business_unit"],
+        },
+    ),
+    Tool(
+        name="gcp_list_projects",
+        description=(
+            "List all provisioned GCP Vertex AI projects. "
+            "Optionally filter by business unit."
         ),
-        Tool(
-            name="gcp_list_projects",
-            description=(
-                "List all provisioned GCP Vertex AI projects. "
-                "Optionally filter by business unit."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "business_unit": {
-                        "type": "string",
-                        "description": "Optional: Filter by business unit",
-                    },
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "business_unit": {
+                    "type": "string",
+                    "description": "Optional: Filter by business unit",
                 },
             },
+        },
+    ),
+    Tool(
+        name="gcp_get_project_details",
+        description=(
+            "Get detailed information about a GCP Vertex AI project, "
+            "including enabled APIs, API keys, usage stats, and audit logs."
         ),
-        Tool(
-            name="gcp_get_project_details",
-            description=(
-                "Get detailed information about a GCP Vertex AI project, "
-                "including enabled APIs, API keys, usage stats, and audit logs."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_id": {
-                        "type": "string",
-                        "description": "GCP project ID",
-                    },
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "GCP project ID",
                 },
-                "required": ["project_id"],
             },
+            "required": ["project_id"],
+        },
+    ),
+    Tool(
+        name="gcp_rotate_api_key",
+        description=(
+            "Rotate the API key for a GCP Vertex AI project. "
+            "This generates a new key, updates the database, revokes the old key, "
+            "and updates the knowledge base."
         ),
-        Tool(
-            name="gcp_rotate_api_key",
-            description=(
-                "Rotate the API key for a GCP Vertex AI project. "
-                "This generates a new key, updates the database, revokes the old key, "
-                "and updates the knowledge base."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_id": {
-                        "type": "string",
-                        "description": "GCP project ID",
-                    },
-                    "performed_by": {
-                        "type": "string",
-                        "description": "Email of user performing the rotation",
-                        "default": "system",
-                    },
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "GCP project ID",
+                },
+                "performed_by": {
+                    "type": "string",
+                    "description": "Email of user performing the rotation",
+                    "default": "system",
                 },
-                "required": ["project_id"],
             },
-        ),
-    ]
+            "required": ["project_id"],
+        },
+    ),
+]
+
+
+@app.list_tools()
+async def list_tools() -> list[Tool]:
+    """List available MCP tools."""
+    return list(_TOOLS)
+
+
+async def _get_project_details(project_id: str) -> dict:
+    """Get project details, reporting a missing project as an error payload."""
+    result = await get_project_details(project_id=project_id)
+    if result is None:
+        return {"error": f"Project {project_id} not found"}
+    return result
+
+
+# Tool name -> coroutine called with the tool arguments as keywords
+_HANDLERS: dict[str, Callable[..., Awaitable[Any]]] = {
+    "gcp_provision_vertex_ai_project": provision_vertex_ai_project,
+    "gcp_check_project_exists": check_project_exists,
+    "gcp_list_projects": list_projects,
+    "gcp_get_project_details": _get_project_details,
+    "gcp_rotate_api_key": rotate_api_key,
+}
+
+# Tool name -> argument names its inputSchema declares; anything else a
+# client sends (including the handlers' internal gcp/db parameters) is dropped
+_TOOL_ARGS: dict[str, tuple[str, ...]] = {
+    tool.name: tuple(tool.inputSchema["properties"]) for tool in _TOOLS
+}
+
+
+def _text(obj: Any) -> list[TextContent]:
+    """Wrap a tool result as MCP text content."""
+    return [TextContent(type="text", text=_dump(obj))]
 
 
 @app.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Handle tool calls."""
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        return _text({"error": f"Unknown tool: {name}"})
+
     try:
-        if name == "gcp_provision_vertex_ai_project":
-            result = await provision_vertex_ai_project(
-                business_unit=arguments["business_unit"],
-                owner_email=arguments["owner_email"],
-            )
-            return [
-                TextContent(
-                    type="text",
-                    text=json.dumps(result.model_dump(), indent=2),
-                )
-            ]
-
-        elif name == "gcp_check_project_exists":
-            result = await check_project_exists(
-                business_unit=arguments["business_unit"]
-            )
-            return [
-                TextContent(
-                    type="text",
-                    text=json.dumps(result, indent=2),
-                )
-            ]
-
-        elif name == "gcp_list_projects":
-            result = await list_projects(
-                business_unit=arguments.get("business_unit")
-            )
-            return [
-                TextContent(
-                    type="text",
-                    text=json.dumps(result, indent=2),
-                )
-            ]
-
-        elif name == "gcp_get_project_details":
-            result = await get_project_details(
-                project_id=arguments["project_id"]
-            )
-            if result is None:
-                return [
-                    TextContent(
-                        type="text",
-                        text=json.dumps({
-                            "error": f"Project {arguments['project_id']} not found"
-                        }),
-                    )
-                ]
-            return [
-                TextContent(
-                    type="text",
-                    text=json.dumps(result, indent=2),
-                )
-            ]
-
-        elif name == "gcp_rotate_api_key":
-            result = await rotate_api_key(
-                project_id=arguments["project_id"],
-                performed_by=arguments.get("performed_by", "system"),
-            )
-            return [
-                TextContent(
-                    type="text",
-                    text=json.dumps(result, indent=2),
-                )
-            ]
-
-        else:
-            return [
-                TextContent(
-                    type="text",
-                    text=json.dumps({"error": f"Unknown tool: {name}"}),
-                )
-            ]
+        result = await handler(**{
+            key: arguments[key] for key in _TOOL_ARGS[name] if key in arguments
+        })
+        if isinstance(result, BaseModel):
+            return [TextContent(type="text", text=result.model_dump_json())]
+        return _text(result)
 
     except Exception as e:
-        return [
-            TextContent(
-                type="text",
-                text=json.dumps({
-                    "error": str(e),
-                    "tool": name,
-                    "arguments": arguments,
-                }),
-            )
-        ]
+        # _dump falls back to str() for values JSON can't encode, so echoing
+        # the arguments can't raise a second error here
+        return _text({
+            "error": str(e),
+            "tool": name,
+            "arguments": arguments,
+        })
 
 
 async def main():
     """Main server entry point."""
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options(),
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options(),
+            )
+    finally:
+        await flush_pending_writes()
+        close_gcp_provider()
 
 
 def run():
@@ -1,13 +1,25 @@
 """API key management tools."""
 
-from ..providers.gcp import get_gcp_provider
-from ..db.supabase import get_supabase_client
+import asyncio
+import logging
+from typing import Optional
+
+from ..providers.gcp import GCPProvider, get_gcp_provider
+from ..db.supabase import SupabaseClient, get_supabase_client
 from ..db.models import APIKeyRotationResult
 from ..utils.kb_updater import update_kb_for_project
-from ..config import settings
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
 
 
-async def rotate_api_key(project_id: str, performed_by: str = "system") -> dict:
+async def rotate_api_key(
+    project_id: str,
+    performed_by: str = "system",
+    *,
+    gcp: Optional[GCPProvider] = None,
+    db: Optional[SupabaseClient] = None,
+) -> dict:
     """
     Rotate the API key for a project.
 
@@ -20,16 +32,22 @@ async def rotate_api_key(project_id: str, performed_by: str = "system") -> dict:
     Args:
         project_id: GCP project ID
         performed_by: User performing the rotation
+        gcp: GCP provider to use (default: the shared instance)
+        db: Supabase client to use (default: the shared instance)
 
     Returns:
         Dictionary with rotation result
     """
-    gcp = get_gcp_provider()
-    db = get_supabase_client()
+    gcp = gcp or get_gcp_provider()
+    db = db or get_supabase_client()
+
+    # Audit events are collected and written in one bulk insert at the end
+    audit_events: list[dict] = []
 
     try:
-        # Get current project
-        project = await db.get_project_by_id(project_id)
+        # Get current project, bypassing the cache: another server process
+        # may have rotated the key since this process cached the row
+        project = await db.get_project_by_id(project_id, use_cache=False)
         if not project:
             return {
                 "success": False,
@@ -58,47 +76,53 @@ async def rotate_api_key(project_id: str, performed_by: str = "system") -> dict:
             }
         )
 
-        # Revoke old key
-        old_key_revoked = False
-        try:
-            old_key_revoked = await gcp.revoke_api_key(project_id, old_key_id)
-        except Exception as e:
-            # Log but don't fail the rotation
-            await db.log_audit_event(
+        # Revoke old key and update knowledge base; neither depends on
+        # the other, so run them concurrently
+        revoke_result, kb_result = await asyncio.gather(
+            gcp.revoke_api_key(project_id, old_key_id),
+            asyncio.to_thread(
+                update_kb_for_project,
+                business_unit=project.business_unit,
                 project_id=project_id,
-                action="old_key_revocation_failed",
-                performed_by=performed_by,
-                details={"error": str(e), "old_key_id": old_key_id}
-            )
+                region=get_settings().gcp_default_region,
+            ),
+            return_exceptions=True,
+        )
+
+        # Log failures but don't fail the rotation
+        old_key_revoked = False
+        if isinstance(revoke_result, Exception):
+            audit_events.append({
+                "project_id": project_id,
+                "action": "old_key_revocation_failed",
+                "performed_by": performed_by,
+                "details": {"error": str(revoke_result), "old_key_id": old_key_id},
+            })
+        else:
+            old_key_revoked = revoke_result
 
-        # Update knowledge base
         kb_updated = False
-        try:
-            kb_updated = update_kb_for_project(
-                business_unit=project.business_unit,
-                project_id=project_id,
-                region=settings.gcp_default_region,
-            )
-        except Exception as e:
-            # Log but don't fail the rotation
-            await db.log_audit_event(
-                project_id=project_id,
-                action="kb_update_failed_on_rotation",
-                performed_by=performed_by,
-                details={"error": str(e)}
-            )
+        if isinstance(kb_result, Exception):
+            audit_events.append({
+                "project_id": project_id,
+                "action": "kb_update_failed_on_rotation",
+                "performed_by": performed_by,
+                "details": {"error": str(kb_result)},
+            })
+        else:
+            kb_updated = kb_result
 
         # Log successful rotation
-        await db.log_audit_event(
-            project_id=project_id,
-            action="api_key_rotated",
-            performed_by=performed_by,
-            details={
+        audit_events.append({
+            "project_id": project_id,
+            "action": "api_key_rotated",
+            "performed_by": performed_by,
+            "details": {
                 "old_key_id": old_key_id,
                 "new_key_id": new_key_id,
                 "old_key_revoked": old_key_revoked,
-            }
-        )
+            },
+        })
 
         return {
             "success": True,
@@ -109,12 +133,12 @@ async def rotate_api_key(project_id: str, performed_by: str = "system") -> dict:
         }
 
     except Exception as e:
-        await db.log_audit_event(
-            project_id=project_id,
-            action="api_key_rotation_failed",
-            performed_by=performed_by,
-            details={"error": str(e)}
-        )
+        audit_events.append({
+            "project_id": project_id,
+            "action": "api_key_rotation_failed",
+            "performed_by": performed_by,
+            "details": {"error": str(e)},
+        })
 
         return {
             "success": False,
@@ -123,3 +147,12 @@ async def rotate_api_key(project_id: str, performed_by: str = "system") -> dict:
             "kb_updated": False,
             "error": str(e),
         }
+
+    finally:
+        # A failed write stays buffered for the next flush; it must not
+        # replace the rotation result, or the caller never sees the new key
+        if audit_events:
+            try:
+                await db.log_audit_events(audit_events)
+            except Exception:
+                logger.exception("Failed to write api key rotation audit events")
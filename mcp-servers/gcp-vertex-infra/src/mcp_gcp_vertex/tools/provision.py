@@ -1,20 +1,30 @@
 """Main orchestration tool for provisioning GCP Vertex AI projects."""
 
 import asyncio
+import functools
+import logging
 from typing import Optional
-from ..providers.gcp import get_gcp_provider
-from ..db.supabase import get_supabase_client
+from ..providers.gcp import GCPProvider, get_gcp_provider
+from ..db.supabase import SupabaseClient, get_supabase_client, PROJECT_SUMMARY_COLUMNS
 from ..db.models import (
     ProjectProvisionResult,
     GCPVertexProject,
 )
 from ..utils.kb_updater import update_kb_for_project
-from ..config import settings
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Shown instead of the key when provisioning finds an existing project
+_EXISTING_KEY_PLACEHOLDER = "(existing key - retrieve from secure storage)"
 
 
 async def provision_vertex_ai_project(
     business_unit: str,
     owner_email: str,
+    *,
+    gcp: Optional[GCPProvider] = None,
+    db: Optional[SupabaseClient] = None,
 ) -> ProjectProvisionResult:
     """
     Main orchestration function to provision a complete Vertex AI project.
@@ -32,33 +42,33 @@ async def provision_vertex_ai_project(
     Args:
         business_unit: Business unit identifier
         owner_email: Email of the project owner
+        gcp: GCP provider to use (default: the shared instance)
+        db: Supabase client to use (default: the shared instance)
 
     Returns:
         ProjectProvisionResult with setup details
     """
-    gcp = get_gcp_provider()
-    db = get_supabase_client()
+    settings = get_settings()
+    gcp = gcp or get_gcp_provider()
+    db = db or get_supabase_client()
 
     try:
         # Step 1: Check if project already exists
         exists_result = await gcp.check_project_exists(business_unit)
         if exists_result.exists:
             # Return existing configuration
-            existing_project = await db.get_project_by_business_unit(business_unit)
-            if existing_project:
-                setup_instructions = _generate_setup_instructions(
-                    business_unit=business_unit,
-                    project_id=existing_project.project_id,
-                    api_key="(existing key - retrieve from secure storage)",
-                    region=settings.gcp_default_region,
-                )
-                return ProjectProvisionResult(
-                    success=True,
-                    project_id=existing_project.project_id,
-                    api_key="(existing key - retrieve from secure storage)",
-                    setup_instructions=setup_instructions,
-                    kb_article_updated=True,
-                )
+            setup_instructions = _existing_project_instructions(
+                business_unit=business_unit,
+                project_id=exists_result.project_id,
+                region=settings.gcp_default_region,
+            )
+            return ProjectProvisionResult(
+                success=True,
+                project_id=exists_result.project_id,
+                api_key=_EXISTING_KEY_PLACEHOLDER,
+                setup_instructions=setup_instructions,
+                kb_article_updated=True,
+            )
 
         # Step 2: Create GCP project
         await db.log_audit_event(
@@ -73,14 +83,15 @@ async def provision_vertex_ai_project(
             owner_email=owner_email,
         )
 
-        # Step 3: Enable required APIs
-        await gcp.enable_ai_apis(project.project_id)
-
-        # Step 4: Verify model availability
-        models = await gcp.verify_model_availability(project.project_id)
-        all_available = all(models.values())
-        if not all_available:
-            missing = [name for name, available in models.items() if not available]
+        # Steps 3-4: Enable required APIs and verify model availability.
+        # Model verification doesn't depend on the enable calls returning,
+        # so both run concurrently; key generation below waits for both.
+        _, models = await asyncio.gather(
+            gcp.enable_ai_apis(project.project_id),
+            gcp.verify_model_availability(project.project_id),
+        )
+        missing = [name for name, available in models.items() if not available]
+        if missing:
             raise Exception(f"Models not available: {', '.join(missing)}")
 
         # Step 5: Generate API key
@@ -96,11 +107,14 @@ async def provision_vertex_ai_project(
 
         # Step 6: Store in Supabase
         stored_project = await db.create_project(project)
+        gcp.invalidate_project_exists(business_unit)
 
         # Step 7: Update knowledge base
         kb_updated = False
         try:
-            kb_updated = update_kb_for_project(
+            # File I/O runs on a worker thread to keep the event loop free
+            kb_updated = await asyncio.to_thread(
+                update_kb_for_project,
                 business_unit=business_unit,
                 project_id=project.project_id,
                 region=settings.gcp_default_region,
@@ -142,16 +156,21 @@ async def provision_vertex_ai_project(
         )
 
     except Exception as e:
-        # Log failure
-        await db.log_audit_event(
-            project_id=None,
-            action="provision_failed",
-            performed_by=owner_email,
-            details={
-                "business_unit": business_unit,
-                "error": str(e),
-            }
-        )
+        # Log failure; if the write fails the event stays buffered for the
+        # next flush, and the caller still gets the failure result below
+        try:
+            await db.log_audit_event(
+                project_id=None,
+                action="provision_failed",
+                performed_by=owner_email,
+                details={
+                    "business_unit": business_unit,
+                    "error": str(e),
+                },
+                flush=True,
+            )
+        except Exception:
+            logger.exception("Failed to write provision_failed audit event")
 
         return ProjectProvisionResult(
             success=False,
@@ -163,6 +182,22 @@ async def provision_vertex_ai_project(
         )
 
 
+@functools.lru_cache(maxsize=256)
+def _existing_project_instructions(
+    business_unit: str,
+    project_id: str,
+    region: str,
+) -> str:
+    """Setup instructions for an existing project (key shown as a placeholder)."""
+    # Only the placeholder variant is cached; real keys are never kept in memory
+    return _generate_setup_instructions(
+        business_unit=business_unit,
+        project_id=project_id,
+        api_key=_EXISTING_KEY_PLACEHOLDER,
+        region=region,
+    )
+
+
 def _generate_setup_instructions(
     business_unit: str,
     project_id: str,
@@ -223,17 +258,22 @@ For issues or questions, contact the 80HD infrastructure team.
 """
 
 
-async def check_project_exists(business_unit: str) -> dict:
+async def check_project_exists(
+    business_unit: str,
+    *,
+    gcp: Optional[GCPProvider] = None,
+) -> dict:
     """
     Check if a project exists for a business unit.
 
     Args:
         business_unit: Business unit identifier
+        gcp: GCP provider to use (default: the shared instance)
 
     Returns:
         Dictionary with existence status and details
     """
-    gcp = get_gcp_provider()
+    gcp = gcp or get_gcp_provider()
     result = await gcp.check_project_exists(business_unit)
 
     return {
@@ -243,58 +283,79 @@ async def check_project_exists(business_unit: str) -> dict:
     }
 
 
-async def list_projects(business_unit: Optional[str] = None) -> list:
+async def list_projects(
+    business_unit: Optional[str] = None,
+    *,
+    db: Optional[SupabaseClient] = None,
+) -> list:
     """
     List all provisioned projects.
 
     Args:
         business_unit: Optional filter by business unit
+        db: Supabase client to use (default: the shared instance)
 
     Returns:
         List of project dictionaries
     """
-    db = get_supabase_client()
-    projects = await db.list_projects(business_unit=business_unit)
+    db = db or get_supabase_client()
+    projects = await db.list_projects(
+        business_unit=business_unit,
+        columns=PROJECT_SUMMARY_COLUMNS,
+        raw=True,
+    )
 
     return [
         {
-            "project_id": p.project_id,
-            "business_unit": p.business_unit,
-            "created_at": p.created_at.isoformat() if p.created_at else None,
-            "api_key_status": p.status,
-            "created_by": p.created_by,
+            "project_id": p["project_id"],
+            "business_unit": p["business_unit"],
+            # Raw PostgREST rows; created_at is already an ISO string
+            "created_at": p["created_at"],
+            "api_key_status": p["status"],
+            "created_by": p["created_by"],
         }
         for p in projects
     ]
 
 
-async def get_project_details(project_id: str) -> Optional[dict]:
+async def get_project_details(
+    project_id: str,
+    *,
+    gcp: Optional[GCPProvider] = None,
+    db: Optional[SupabaseClient] = None,
+) -> Optional[dict]:
     """
     Get detailed information about a project.
 
     Args:
         project_id: GCP project ID
+        gcp: GCP provider to use (default: the shared instance)
+        db: Supabase client to use (default: the shared instance)
 
     Returns:
         Project details dictionary or None
     """
-    gcp = get_gcp_provider()
-    db = get_supabase_client()
-
-    # Get GCP details
-    gcp_details = await gcp.get_project_details(project_id)
+    gcp = gcp or get_gcp_provider()
+    db = db or get_supabase_client()
+
+    # GCP details, DB record and recent audit logs are independent lookups
+    gcp_details, db_project, audit_logs = await asyncio.gather(
+        gcp.get_project_details(project_id),
+        db.get_project_by_id(project_id),
+        db.get_audit_logs(
+            project_id,
+            limit=10,
+            columns=("action", "performed_by", "performed_at", "details"),
+        ),
+    )
     if not gcp_details:
         return None
 
-    # Get DB details
-    db_project = await db.get_project_by_id(project_id)
-
-    # Get recent audit logs
-    audit_logs = await db.get_audit_logs(project_id, limit=10)
-
     return {
         "gcp": gcp_details,
-        "database": db_project.model_dump() if db_project else None,
+        "database": (
+            db_project.model_dump(exclude={"api_key_value"}) if db_project else None
+        ),
         "recent_activity": [
             {
                 "action": log.action,
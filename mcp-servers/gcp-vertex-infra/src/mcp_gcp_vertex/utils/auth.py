@@ -1,24 +1,41 @@
 """Authentication utilities for GCP."""
 
-from google.auth import default as get_default_credentials
-from google.auth.exceptions import DefaultCredentialsError
-from typing import Tuple, Optional
-from google.auth.credentials import Credentials
+from typing import TYPE_CHECKING, Tuple, Optional
 
+# google.auth is imported inside the functions that use it to keep this
+# module cheap to import
+if TYPE_CHECKING:
+    from google.auth.credentials import Credentials
+    from google.auth.transport.requests import Request
 
-def get_credentials() -> Tuple[Credentials, Optional[str]]:
+# ADC discovery can fall back to the metadata server, so resolve it once
+_credentials: Optional[Tuple["Credentials", Optional[str]]] = None
+_refresh_request: Optional["Request"] = None
+
+
+def get_credentials() -> Tuple["Credentials", Optional[str]]:
     """
     Get GCP credentials using Application Default Credentials.
 
+    The result is cached for the life of the process; call
+    invalidate_credentials() to force a fresh lookup.
+
     Returns:
         Tuple of (credentials, project_id)
 
     Raises:
         DefaultCredentialsError: If credentials cannot be found
     """
+    global _credentials
+    if _credentials is not None:
+        return _credentials
+
+    from google.auth import default as get_default_credentials
+    from google.auth.exceptions import DefaultCredentialsError
+
     try:
-        credentials, project = get_default_credentials()
-        return credentials, project
+        _credentials = get_default_credentials()
+        return _credentials
     except DefaultCredentialsError as e:
         raise Exception(
             "GCP credentials not found. Please run:\n"
@@ -36,9 +53,25 @@ def verify_credentials() -> bool:
     """
     try:
         credentials, _ = get_credentials()
-        # Try to refresh the credentials to verify they work
+        # Only refresh when the cached token is missing or expired
         if not credentials.valid:
-            credentials.refresh()
+            credentials.refresh(_get_refresh_request())
         return True
     except Exception:
         return False
+
+
+def invalidate_credentials() -> None:
+    """Drop cached credentials so the next call re-runs ADC discovery."""
+    global _credentials
+    _credentials = None
+
+
+def _get_refresh_request() -> "Request":
+    """Get the shared transport request used for token refreshes."""
+    global _refresh_request
+    if _refresh_request is None:
+        from google.auth.transport.requests import Request
+
+        _refresh_request = Request()
+    return _refresh_request
@@ -0,0 +1,56 @@
+"""In-process caching utilities."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after a fixed time-to-live."""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60.0):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept before evicting the LRU one
+            ttl: Seconds an entry stays valid after it was stored
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value for key, or default if missing/expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        if self.ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove key and return its value, or default if not cached."""
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,9 +1,47 @@
 """Knowledge base article updater for GCP Vertex AI configurations."""
 
+import contextlib
+import fcntl
+import functools
+import hashlib
+import mmap
+import os
 import re
+import shutil
+import tempfile
+import threading
 from pathlib import Path
 from typing import Optional
-from ..config import settings
+from ..config import get_settings
+
+_BU_CONFIG_HEADER = re.compile(r"## Business Unit Configurations\n")
+_BU_CONFIG_HEADER_BYTES = b"## Business Unit Configurations\n"
+_FIRST_H2 = re.compile(r"\n## ")
+
+# In-process guard; the flock in KnowledgeBaseUpdater._lock covers other processes
+_KB_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=256)
+def _bu_section_pattern(business_unit: str) -> re.Pattern:
+    """Compiled pattern for a business unit section up to the next heading."""
+    return re.compile(
+        rf"### {re.escape(business_unit)}\n"
+        r".*?"
+        r"(?=\n###|\n##|\Z)",
+        re.DOTALL,
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _bu_remove_pattern(business_unit: str) -> re.Pattern:
+    """Compiled pattern for a business unit section plus its trailing blank lines."""
+    return re.compile(
+        rf"### {re.escape(business_unit)}\n"
+        r".*?"
+        r"(?=\n###|\n##|\Z)\n*",
+        re.DOTALL,
+    )
 
 
 class KnowledgeBaseUpdater:
@@ -11,7 +49,7 @@ class KnowledgeBaseUpdater:
 
     def __init__(self, kb_path: Optional[str] = None):
         """Initialize with knowledge base file path."""
-        self.kb_path = Path(kb_path or settings.kb_path)
+        self.kb_path = Path(kb_path or get_settings().kb_path)
 
     def update_business_unit_config(
         self,
@@ -37,27 +75,107 @@ class KnowledgeBaseUpdater:
         if not self.kb_path.exists():
             raise FileNotFoundError(f"Knowledge base file not found: {self.kb_path}")
 
-        # Read current content
-        content = self.kb_path.read_text()
-
         # Create business unit section
         bu_section = self._create_business_unit_section(
             business_unit, project_id, region
         )
 
-        # Check if this business unit already exists
-        bu_pattern = rf"### {re.escape(business_unit)}\n"
-        if re.search(bu_pattern, content):
-            # Update existing section
-            content = self._update_existing_section(content, business_unit, bu_section)
-        else:
-            # Add new section
-            content = self._add_new_section(content, bu_section)
+        # Serialize read-modify-write cycles across threads and processes
+        with self._lock():
+            # Common case: a new business unit and the config section is last
+            if self._append_new_section(business_unit, bu_section):
+                return True
+
+            # Read current content
+            content = self.kb_path.read_text(encoding="utf-8")
+
+            # Replace an existing section in one pass; the callback keeps the
+            # section's backslashes from being read as replacement escapes
+            content, replaced = _bu_section_pattern(business_unit).subn(
+                lambda _: bu_section, content, count=1
+            )
+            if not replaced:
+                # Add new section
+                content = self._add_new_section(content, bu_section)
+
+            # Write updated content
+            self._write_atomic(content)
+            return True
+
+    @contextlib.contextmanager
+    def _lock(self):
+        """
+        Hold an exclusive lock on the article for a read-modify-write cycle.
+
+        The flock is taken on a separate lock file because rewrites replace
+        the article itself with a new inode. It lives in the temp directory,
+        keyed by the article's resolved path, so no stray file is left in the
+        (git-tracked) knowledge base directory.
+        """
+        path_hash = hashlib.sha256(str(self.kb_path.resolve()).encode()).hexdigest()
+        lock_path = Path(tempfile.gettempdir()) / f"80hd-kb-{path_hash[:16]}.lock"
+        with _KB_LOCK, open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _append_new_section(self, business_unit: str, new_section: str) -> bool:
+        """
+        Append a new business unit section without rewriting the file.
+
+        Only applies when the business unit isn't in the file yet and
+        "## Business Unit Configurations" is the last ## section, so the
+        end of the file is the end of that section.
+
+        Args:
+            business_unit: Business unit name
+            new_section: Markdown section to append
 
-        # Write updated content
-        self.kb_path.write_text(content)
+        Returns:
+            True if the section was appended, False if a rewrite is needed
+        """
+        with self.kb_path.open("rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(f"### {business_unit}\n".encode("utf-8")) != -1:
+                    return False
+                # rfind returns -1 when there's no "\n## ", which lines the
+                # header check up with offset 0 (header on the first line)
+                last_h2 = mm.rfind(b"\n## ") + 1
+                if mm.find(_BU_CONFIG_HEADER_BYTES, last_h2) != last_h2:
+                    return False
+                ends_with_newline = mm[-1:] == b"\n"
+
+        with self.kb_path.open("a", encoding="utf-8") as f:
+            f.write(("" if ends_with_newline else "\n") + "\n" + new_section)
         return True
 
+    def _write_atomic(self, content: str) -> None:
+        """
+        Write content via a temp file and rename so readers never see a torn file.
+
+        The rename targets the resolved path so a symlinked article stays a
+        symlink, and the article's permissions are copied to the new file.
+        """
+        target = self.kb_path.resolve()
+        tmp = tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=target.parent,
+            prefix=f".{target.name}.",
+            suffix=".tmp",
+            delete=False,
+        )
+        try:
+            with tmp:
+                tmp.write(content)
+            shutil.copymode(target, tmp.name)
+            os.replace(tmp.name, target)
+        except BaseException:
+            # Don't leave a stray temp file in the knowledge base directory
+            os.unlink(tmp.name)
+            raise
+
     def _create_business_unit_section(
         self,
         business_unit: str,
@@ -89,43 +207,12 @@ curl -X POST \\
 ```
 """
 
-    def _update_existing_section(
-        self,
-        content: str,
-        business_unit: str,
-        new_section: str,
-    ) -> str:
-        """Update an existing business unit section."""
-        # Find the section start
-        section_start_pattern = rf"(### {re.escape(business_unit)}\n)"
-
-        # Find the next section or end of content
-        # Match either next ### heading or end of string
-        section_pattern = (
-            rf"{section_start_pattern}"
-            r"(.*?)"
-            r"(?=\n###|\Z)"
-        )
-
-        # Replace the entire section
-        updated_content = re.sub(
-            section_pattern,
-            new_section,
-            content,
-            flags=re.DOTALL
-        )
-
-        return updated_content
-
     def _add_new_section(self, content: str, new_section: str) -> str:
         """Add a new business unit section to the document."""
         # Look for "## Business Unit Configurations" section
-        bu_config_pattern = r"## Business Unit Configurations\n"
-
-        if re.search(bu_config_pattern, content):
+        if _BU_CONFIG_HEADER.search(content):
             # Add after the section header
-            updated_content = re.sub(
-                bu_config_pattern,
+            updated_content = _BU_CONFIG_HEADER.sub(
                 f"## Business Unit Configurations\n\n{new_section}\n",
                 content,
                 count=1
@@ -136,7 +223,7 @@ curl -X POST \\
             # Add before any "## " section or at the end
             if "## " in content:
                 # Find first ## heading
-                first_section = re.search(r"\n## ", content)
+                first_section = _FIRST_H2.search(content)
                 if first_section:
                     insert_pos = first_section.start()
                     updated_content = (
@@ -164,27 +251,15 @@ curl -X POST \\
         if not self.kb_path.exists():
             return False
 
-        content = self.kb_path.read_text()
+        with self._lock():
+            content = self.kb_path.read_text(encoding="utf-8")
 
-        # Find and remove the section
-        section_pattern = (
-            rf"### {re.escape(business_unit)}\n"
-            r".*?"
-            r"(?=\n###|\n##|\Z)"
-        )
-
-        updated_content = re.sub(
-            section_pattern,
-            "",
-            content,
-            flags=re.DOTALL
-        )
+            # Find and remove the section; the pattern also consumes the
+            # blank lines after it so no gap is left behind
+            updated_content = _bu_remove_pattern(business_unit).sub("", content)
 
-        # Clean up any double newlines
-        updated_content = re.sub(r"\n\n\n+", "\n\n", updated_content)
-
-        self.kb_path.write_text(updated_content)
-        return True
+            self._write_atomic(updated_content)
+            return True
 
 
 def update_kb_for_project(